@@ -0,0 +1,11 @@
+"""One-time conversion of data/Superstore.csv to a pre-typed Parquet file.
+
+Run this again whenever the CSV changes; until then the loader falls back
+to parsing the CSV.
+"""
+from model.data_processor import read_csv_data, optimize_dtypes, PARQUET_PATH
+
+if __name__ == '__main__':
+    df = optimize_dtypes(read_csv_data())
+    df.to_parquet(PARQUET_PATH, engine='pyarrow', compression='zstd', index=False)
+    print(f"Wrote {len(df)} rows to {PARQUET_PATH}")
@@ -1,59 +1,102 @@
+import os
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+DATA_PATH = "data/Superstore.csv"
+PARQUET_PATH = "data/Superstore.parquet"
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORY_COLUMNS = ['Region', 'Category', 'Sub-Category', 'Segment', 'Ship Mode', 'Customer ID']
+
+# Month-indexed lookup tables; index 0 covers rows with a missing date
+SEASONS = np.array(['Unknown', 'Winter', 'Winter', 'Spring', 'Spring', 'Spring',
+                    'Summer', 'Summer', 'Summer', 'Fall', 'Fall', 'Fall', 'Winter'])
+HOLIDAY_MONTHS = np.isin(np.arange(13), [11, 12])
+YEAR_END_MONTHS = np.isin(np.arange(13), [12, 1])
+
+# PriceTier holds integer codes into PRICE_TIERS (-1 when Sales is out of range)
+PRICE_TIER_BINS = np.array([0, 50, 200, 500, np.inf], dtype=np.float64)
+PRICE_TIERS = ['Low', 'Medium', 'High', 'Very High']
+
+def get_data_version():
+    """Return the newest source file modification time, used to key the caches"""
+    paths = [p for p in (DATA_PATH, PARQUET_PATH) if os.path.exists(p)]
+    return max(os.path.getmtime(p) for p in paths)
+
 def load_and_preprocess_data():
-    """Load and preprocess the Superstore data"""
+    """Load and preprocess the Superstore data (cached until the CSV changes)"""
+    # Hand out a copy so callers can add columns without touching the cache
+    return load_cached_data(get_data_version()).copy()
+
+def load_shared_data():
+    """Return the cached frame itself, without a copy; callers must not mutate it"""
+    return load_cached_data(get_data_version())
+
+@lru_cache(maxsize=1)
+def load_cached_data(version):
+    """Run the full load pipeline once per data version"""
+    # Prefer the pre-typed Parquet copy unless the CSV has been edited since
+    if os.path.exists(PARQUET_PATH) and os.path.getmtime(PARQUET_PATH) >= os.path.getmtime(DATA_PATH):
+        df = pd.read_parquet(PARQUET_PATH, engine='pyarrow')
+    else:
+        df = read_csv_data()
+    
+    # Idempotent, so an older Parquet file still ends up fully typed
+    df = optimize_dtypes(df)
+    
+    # Feature engineering
+    df = engineer_features(df)
+    
+    return df
+
+def read_csv_data():
+    """Read the raw CSV with cleaned column names and parsed dates"""
     # Load with correct encoding
-    df = pd.read_csv("data/Superstore.csv", encoding='latin1')
+    df = pd.read_csv(DATA_PATH, encoding='latin1')
     
     # Clean column names (remove extra spaces)
     df.columns = df.columns.str.strip()
     
-    # Convert date columns - handle multiple date formats
+    # Convert date columns
     df = convert_dates(df)
     
-    # Feature engineering
-    df = engineer_features(df)
+    return df
+
+def optimize_dtypes(df):
+    """Shrink the working set: categorical text keys and downcast counters"""
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    
+    # Sales and Profit stay float64: they feed currency totals and the model
+    if 'Quantity' in df.columns:
+        df['Quantity'] = pd.to_numeric(df['Quantity'], downcast='integer')
+    if 'Discount' in df.columns:
+        df['Discount'] = pd.to_numeric(df['Discount'], downcast='float')
     
     return df
 
 def convert_dates(df):
-    """Convert date columns with flexible format handling"""
+    """Convert date columns using the dataset's fixed US format"""
     
     # List of possible date columns
     date_columns = ['Order Date', 'Ship Date']
     
     for col in date_columns:
         if col in df.columns:
-            # First, try to infer the format
-            try:
-                # Try parsing with dayfirst=False (US format: MM/DD/YYYY)
-                df[col] = pd.to_datetime(df[col], dayfirst=False)
-                print(f"Successfully parsed {col} with US format (MM/DD/YYYY)")
-            except:
-                try:
-                    # Try parsing with dayfirst=True (European format: DD/MM/YYYY)
-                    df[col] = pd.to_datetime(df[col], dayfirst=True)
-                    print(f"Successfully parsed {col} with European format (DD/MM/YYYY)")
-                except:
-                    try:
-                        # Try parsing with format='mixed'
-                        df[col] = pd.to_datetime(df[col], format='mixed')
-                        print(f"Successfully parsed {col} with mixed format")
-                    except Exception as e:
-                        print(f"Warning: Could not parse {col}: {str(e)}")
-                        # Keep as string if parsing fails
+            # Superstore dates are always MM/DD/YYYY; an explicit format skips
+            # inference, and cache=True parses each distinct date string once
+            df[col] = pd.to_datetime(df[col], format='%m/%d/%Y', errors='coerce', cache=True)
                         
     return df
 
 def engineer_features(df):
     """Engineer new features for better forecasting"""
     
-    # Ensure date columns are datetime
-    for col in ['Order Date', 'Ship Date']:
-        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
-            df[col] = pd.to_datetime(df[col], errors='coerce')
+    # Date columns arrive as datetime64 from both load paths
+    # (Parquet stores them typed, the CSV path runs convert_dates)
     
     # Basic date features
     if 'Order Date' in df.columns:
@@ -63,26 +106,21 @@ def engineer_features(df):
         df['DayOfWeek'] = df['Order Date'].dt.dayofweek
         df['DayOfMonth'] = df['Order Date'].dt.day
         df['WeekOfYear'] = df['Order Date'].dt.isocalendar().week
+    
+    if 'Month' in df.columns:
+        # Index the lookup tables by month number instead of testing each row
+        month = df['Month'].fillna(0).to_numpy(dtype=np.int64)
         
-        # Create month-year period for grouping
-        df['MonthPeriod'] = df['Order Date'].dt.to_period('M')
-    
-    # Holiday indicators (US holidays - adjust as needed)
-    df['IsHolidayMonth'] = df['Month'].isin([11, 12]) if 'Month' in df.columns else False
-    df['IsYearEnd'] = df['Month'].isin([12, 1]) if 'Month' in df.columns else False
-    
-    # Season indicators
-    def get_season(month):
-        if month in [12, 1, 2]:
-            return 'Winter'
-        elif month in [3, 4, 5]:
-            return 'Spring'
-        elif month in [6, 7, 8]:
-            return 'Summer'
-        else:
-            return 'Fall'
-    
-    df['Season'] = df['Month'].apply(get_season) if 'Month' in df.columns else 'Unknown'
+        # Holiday indicators (US holidays - adjust as needed)
+        df['IsHolidayMonth'] = HOLIDAY_MONTHS[month]
+        df['IsYearEnd'] = YEAR_END_MONTHS[month]
+        
+        # Season indicators
+        df['Season'] = SEASONS[month]
+    else:
+        df['IsHolidayMonth'] = False
+        df['IsYearEnd'] = False
+        df['Season'] = 'Unknown'
     
     # Business metrics
     if 'Profit' in df.columns and 'Sales' in df.columns:
@@ -95,17 +133,21 @@ def engineer_features(df):
     
     # Price tier
     if 'Sales' in df.columns:
-        df['PriceTier'] = pd.cut(df['Sales'], 
-                                bins=[0, 50, 200, 500, float('inf')],
-                                labels=['Low', 'Medium', 'High', 'Very High'])
+        tiers = pd.cut(df['Sales'].to_numpy(), bins=PRICE_TIER_BINS, labels=False)
+        df['PriceTier'] = np.nan_to_num(tiers, nan=-1).astype(np.int8)
     
     # Customer frequency (simplified)
     if 'Customer ID' in df.columns:
-        customer_orders = df.groupby('Customer ID').size()
-        df['CustomerOrderCount'] = df['Customer ID'].map(customer_orders)
+        df['CustomerOrderCount'] = df.groupby('Customer ID', observed=True)['Customer ID'].transform('size')
     
     return df
 
+def get_month_starts(df):
+    """Order dates truncated to month starts, as an array for grouping"""
+    # NumPy truncation avoids boxing each month into a Period object, and
+    # grouping on the array keeps each month's summation order intact
+    return df['Order Date'].to_numpy().astype('datetime64[M]').astype('datetime64[ns]')
+
 def get_filter_options(df):
     """Get unique values for filters"""
     options = {}
@@ -1,16 +1,40 @@
+import os
+import hashlib
+import tempfile
+from functools import lru_cache
+import joblib
 import pandas as pd
 import numpy as np
 from statsmodels.tsa.arima.model import ARIMA
 from sklearn.metrics import mean_absolute_error, mean_squared_error
-from model.data_processor import load_and_preprocess_data
+from model.data_processor import load_cached_data, get_data_version, get_month_starts
 import warnings
 warnings.filterwarnings('ignore')
 
+# Fitted ARIMA models, one file per distinct training series (so per filter
+# combination and per data edit). Files are never pruned; the directory is
+# safe to delete at any time and models are refitted on demand.
+MODEL_CACHE_DIR = "cache"
+
 def generate_forecast(df=None, region='All', category='All', year='All'):
     """Generate sales forecast using ARIMA model"""
     
     if df is None:
-        df = load_and_preprocess_data()
+        # Memoize on the filter values only, never on the DataFrame itself
+        monthly_sales, forecast_df, insights = cached_forecast(get_data_version(), region, category, year)
+        # Routes reformat the frames in place, so hand out copies
+        return monthly_sales.copy(), forecast_df.copy(), dict(insights)
+    
+    return build_forecast(df, region, category, year)
+
+@lru_cache(maxsize=64)
+def cached_forecast(version, region, category, year):
+    """Forecast for one filter combination, cached per CSV version"""
+    # build_forecast only filters and aggregates, so it can read the shared frame
+    return build_forecast(load_cached_data(version), region, category, year)
+
+def build_forecast(df, region='All', category='All', year='All'):
+    """Fit the model and build forecast and insights for the given frame"""
     
     # Apply filters if specified
     if region != 'All':
@@ -21,19 +45,7 @@ def generate_forecast(df=None, region='All', category='All', year='All'):
         df = df[df['Year'] == int(year)]
     
     # Prepare time series data
-    # First, ensure we have the MonthPeriod column
-    if 'MonthPeriod' not in df.columns and 'Order Date' in df.columns:
-        df['MonthPeriod'] = df['Order Date'].dt.to_period('M')
-    
-    # Group by month and sum sales
-    monthly_sales = df.groupby('MonthPeriod')['Sales'].sum().reset_index()
-    
-    # Convert MonthPeriod to datetime properly
-    monthly_sales['Month'] = monthly_sales['MonthPeriod'].dt.to_timestamp()
-    monthly_sales = monthly_sales.sort_values('Month')
-    
-    # Drop the MonthPeriod column as we now have Month
-    monthly_sales = monthly_sales[['Month', 'Sales']].copy()
+    monthly_sales = df.groupby(get_month_starts(df))['Sales'].sum().rename_axis('Month').reset_index()
     
     # Handle missing months (if any) - create a complete date range
     if len(monthly_sales) > 0:
@@ -48,8 +60,14 @@ def generate_forecast(df=None, region='All', category='All', year='All'):
         monthly_sales.index.name = 'Month'
         monthly_sales = monthly_sales.reset_index()
         
-        # Fill missing values with forward fill, then backward fill
-        monthly_sales['Sales'] = monthly_sales['Sales'].fillna(method='ffill').fillna(method='bfill').fillna(0)
+        # Fill missing months by linear interpolation on a single NumPy array;
+        # the first and last months always have orders, so np.interp has anchors
+        sales = monthly_sales['Sales'].to_numpy(dtype=np.float64, copy=True)
+        missing = np.isnan(sales)
+        if missing.any():
+            positions = np.arange(len(sales))
+            sales[missing] = np.interp(positions[missing], positions[~missing], sales[~missing])
+        monthly_sales['Sales'] = sales
     else:
         # Return empty dataframes if no data
         empty_monthly = pd.DataFrame(columns=['Month', 'Sales'])
@@ -72,23 +90,23 @@ def generate_forecast(df=None, region='All', category='All', year='All'):
     
     # Split data for validation
     train_size = max(int(len(monthly_sales) * 0.8), 12)  # At least 12 months for training
-    if train_size < len(monthly_sales):
-        train = monthly_sales['Sales'].iloc[:train_size].values
-        test = monthly_sales['Sales'].iloc[train_size:].values
+    if train_size < len(sales):
+        train = sales[:train_size]
+        test = sales[train_size:]
     else:
-        train = monthly_sales['Sales'].values
+        train = sales
         test = []
     
     try:
         # Train ARIMA model with error handling
         if len(train) >= 12:  # Need sufficient data for seasonal ARIMA
             # Simple ARIMA model (non-seasonal)
-            model = ARIMA(train, order=(2,1,1))
-            model_fit = model.fit()
+            model_fit = fit_arima(train, order=(2,1,1))
             
             # Forecast
             forecast_steps = 12
-            forecast_result = model_fit.forecast(steps=forecast_steps)
+            forecast_result = np.asarray(model_fit.forecast(steps=forecast_steps), dtype=np.float64)
+            lower_ci, upper_ci = confidence_band(forecast_result, 0.1)  # Simplified confidence interval
             
             # Create forecast DataFrame with proper column names
             last_date = monthly_sales['Month'].max()
@@ -102,8 +120,8 @@ def generate_forecast(df=None, region='All', category='All', year='All'):
             forecast_df = pd.DataFrame({
                 'Month': future_dates,
                 'Forecast': forecast_result,
-                'Lower_CI': forecast_result * 0.9,  # Simplified confidence interval
-                'Upper_CI': forecast_result * 1.1
+                'Lower_CI': lower_ci,
+                'Upper_CI': upper_ci
             })
             
             # Calculate model accuracy on test set
@@ -128,6 +146,40 @@ def generate_forecast(df=None, region='All', category='All', year='All'):
         print(f"ARIMA failed: {e}, using fallback")
         return generate_simple_forecast(monthly_sales, df)
 
+def fit_arima(train, order):
+    """Fit an ARIMA model, reusing a fit persisted for identical training data"""
+    train = np.ascontiguousarray(train, dtype=np.float64)
+    key = hashlib.sha1(train.tobytes() + repr(order).encode()).hexdigest()
+    path = os.path.join(MODEL_CACHE_DIR, f"arima_{key}.joblib")
+    
+    if os.path.exists(path):
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            print(f"Could not load cached model {path}: {e}, refitting")
+    
+    model_fit = ARIMA(train, order=order).fit()
+    
+    # Write to a temp file and rename it into place, so other workers never
+    # see a partially written model at the final path
+    tmp_path = None
+    try:
+        os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=MODEL_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            joblib.dump(model_fit, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        # A failed save only costs a refit later; keep serving this fit
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        print(f"Could not cache model {path}: {e}")
+    return model_fit
+
+def confidence_band(forecast, width):
+    """Symmetric +/- width band around a forecast array"""
+    return forecast * (1 - width), forecast * (1 + width)
+
 def generate_simple_forecast(monthly_sales, df):
     """Simple forecasting method as fallback"""
     # Simple moving average forecast
@@ -153,12 +205,15 @@ def generate_simple_forecast(monthly_sales, df):
             freq='MS'
         )
     
+    forecast_result = np.full(forecast_steps, avg_sales, dtype=np.float64)
+    lower_ci, upper_ci = confidence_band(forecast_result, 0.15)
+    
     # Create forecast DataFrame with all columns at once
     forecast_df = pd.DataFrame({
         'Month': future_dates,
-        'Forecast': [avg_sales] * forecast_steps,
-        'Lower_CI': [avg_sales * 0.85] * forecast_steps,
-        'Upper_CI': [avg_sales * 1.15] * forecast_steps
+        'Forecast': forecast_result,
+        'Lower_CI': lower_ci,
+        'Upper_CI': upper_ci
     })
     
     insights = generate_insights(df, monthly_sales, forecast_df, 75)
@@ -176,13 +231,13 @@ def generate_insights(df, monthly_sales, forecast_df, accuracy):
     
     # Top performing
     if 'Category' in df.columns and 'Sales' in df.columns:
-        category_sales = df.groupby('Category')['Sales'].sum()
+        category_sales = df.groupby('Category', observed=True)['Sales'].sum()
         top_category = category_sales.idxmax() if len(category_sales) > 0 else 'N/A'
     else:
         top_category = 'N/A'
     
     if 'Region' in df.columns and 'Sales' in df.columns:
-        region_sales = df.groupby('Region')['Sales'].sum()
+        region_sales = df.groupby('Region', observed=True)['Sales'].sum()
         top_region = region_sales.idxmax() if len(region_sales) > 0 else 'N/A'
     else:
         top_region = 'N/A'
@@ -190,7 +245,7 @@ def generate_insights(df, monthly_sales, forecast_df, accuracy):
     if 'Product Name' in df.columns and 'Sales' in df.columns:
         product_sales = df.groupby('Product Name')['Sales'].sum()
         if len(product_sales) > 0:
-            top_product = product_sales.nlargest(1).index[0]
+            top_product = product_sales.idxmax()
         else:
             top_product = 'N/A'
     else:
@@ -198,29 +253,31 @@ def generate_insights(df, monthly_sales, forecast_df, accuracy):
     
     # Time-based insights
     if len(monthly_sales) > 0:
-        monthly_sales['MonthName'] = monthly_sales['Month'].dt.strftime('%B %Y')
-        peak_month = monthly_sales.loc[monthly_sales['Sales'].idxmax(), 'MonthName'] if len(monthly_sales) > 0 else 'N/A'
-        low_month = monthly_sales.loc[monthly_sales['Sales'].idxmin(), 'MonthName'] if len(monthly_sales) > 0 else 'N/A'
+        # Only the two extremes need formatting, not the whole column
+        sales = monthly_sales['Sales'].to_numpy()
+        peak_month = monthly_sales['Month'].iloc[int(np.argmax(sales))].strftime('%B %Y')
+        low_month = monthly_sales['Month'].iloc[int(np.argmin(sales))].strftime('%B %Y')
     else:
         peak_month = 'N/A'
         low_month = 'N/A'
     
     # Forecast insights
     if len(monthly_sales) >= 12 and len(forecast_df) > 0:
-        recent_avg = monthly_sales['Sales'].tail(12).mean()
-        forecast_avg = forecast_df['Forecast'].mean()
+        forecast = forecast_df['Forecast'].to_numpy(dtype=np.float64)
+        recent_avg = monthly_sales['Sales'].to_numpy()[-12:].mean()
+        forecast_avg = forecast.mean()
         if recent_avg > 0:
             forecast_growth = ((forecast_avg / recent_avg) - 1) * 100
         else:
             forecast_growth = 0
-        next_peak_forecast = forecast_df.loc[forecast_df['Forecast'].idxmax(), 'Month'].strftime('%B %Y')
+        next_peak_forecast = forecast_df['Month'].iloc[int(forecast.argmax())].strftime('%B %Y')
     else:
         forecast_growth = 12.5  # Default
         next_peak_forecast = 'December 2024'  # Default
     
     # Profitability insights
     if 'Category' in df.columns and 'Profit' in df.columns:
-        profitable_categories = df[df['Profit'] > 0].groupby('Category').size()
+        profitable_categories = df[df['Profit'] > 0].groupby('Category', observed=True).size()
         most_profitable = profitable_categories.idxmax() if len(profitable_categories) > 0 else "N/A"
     else:
         most_profitable = "N/A"
@@ -247,5 +304,4 @@ def generate_insights(df, monthly_sales, forecast_df, accuracy):
 
 def get_filtered_data(region='All', category='All', year='All'):
     """Get filtered data for dashboard"""
-    df = load_and_preprocess_data()
-    return generate_forecast(df, region, category, year)
\ No newline at end of file
+    return generate_forecast(region=region, category=category, year=year)
\ No newline at end of file